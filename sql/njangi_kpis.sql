@@ -0,0 +1,24 @@
+-- Dashboard KPI totals, computed in Postgres so the app fetches one row
+-- instead of every contribution / payment / loan.
+-- Called from streamlit_app.py as supabase.rpc("njangi_kpis").
+-- Column names follow the usual Njangi schema; adjust if yours differ.
+create or replace function njangi_kpis()
+returns table (
+    pot        numeric,
+    foundation numeric,
+    loans_due  numeric,
+    interest   numeric,
+    members    bigint
+)
+language sql
+stable
+as $$
+    select
+        (select coalesce(sum(amount), 0)      from contributions),
+        (select coalesce(sum(amount_paid), 0) from foundation_payments),
+        (select coalesce(sum(total_due), 0)   from loans),
+        (select coalesce(sum(interest), 0)    from history),
+        (select count(*)                      from members);
+$$;
+
+grant execute on function njangi_kpis() to anon, authenticated;
@@ -0,0 +1,22 @@
+-- Top-N members by total contributions for the Dashboard bar chart.
+-- Called from streamlit_app.py as supabase.rpc("top_contributors", {"n": 10}).
+-- Column names follow the usual Njangi schema; adjust if yours differ.
+create or replace function top_contributors(n int default 10)
+returns table (
+    member text,
+    amount numeric
+)
+language sql
+stable
+as $$
+    select
+        coalesce(m.name, 'Member') as member,
+        coalesce(sum(c.amount), 0) as amount
+    from contributions c
+    left join members m on m.id = c.member_id
+    group by 1
+    order by 2 desc
+    limit n;
+$$;
+
+grant execute on function top_contributors(int) to anon, authenticated;
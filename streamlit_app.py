@@ -1,11 +1,22 @@
+import decimal
+import json
+import numbers
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from supabase import create_client
+from postgrest.exceptions import APIError
 import altair as alt
 
 # ============================================================
 # CONFIG
 # ============================================================
+FOOTER = "✅ If you see 0s but your website shows data, your Streamlit SUPABASE_URL/ANON_KEY are pointing to a different Supabase project."
+
 st.set_page_config(page_title="The Young Shall Grow: Progress", layout="wide")
 st.title("🌱 The Young Shall Grow: Progress")
 
@@ -22,82 +33,420 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     st.error("❌ Missing SUPABASE_URL or SUPABASE_ANON_KEY in Streamlit Secrets.")
     st.stop()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+@st.cache_resource
+def get_supabase():
+    """
+    One client per server process, reused across reruns and sessions
+    so the underlying HTTP connection pool stays warm.
+    """
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+supabase = get_supabase()
+
+# ============================================================
+# SHARED CACHE (optional)
+# st.cache_data lives in one server process. If the secrets also contain
+# REDIS_URL = "redis://..." (and `redis` is installed), raw query results
+# are shared across processes/restarts for CACHE_TTL seconds.
+# ============================================================
+CACHE_TTL = 30
+REDIS_TIMEOUT = 0.5  # seconds; redis-py otherwise waits forever
+
+@st.cache_resource
+def get_redis():
+    url = st.secrets.get("REDIS_URL")
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        return None
+    return redis.Redis.from_url(url, socket_connect_timeout=REDIS_TIMEOUT, socket_timeout=REDIS_TIMEOUT)
+
+redis_client = get_redis()
+# Set on the first Redis error; the rest of this run (and its worker
+# threads) then skips Redis instead of waiting on it again.
+redis_down = threading.Event()
+
+def shared_cached(key: str, compute):
+    """
+    Return `compute()`'s JSON-able result, going through Redis when set up.
+    Redis errors never break a page; the query just runs directly.
+    """
+    if redis_client is None or redis_down.is_set():
+        return compute()
+    key = f"tysg:{key}"
+    try:
+        hit = redis_client.get(key)
+    except Exception:
+        redis_down.set()
+        return compute()
+    if hit is not None:
+        return json.loads(hit)
+    value = compute()
+    try:
+        redis_client.setex(key, CACHE_TTL, json.dumps(value, default=str))
+    except Exception:
+        redis_down.set()
+    return value
 
 # ============================================================
 # HELPERS
 # ============================================================
+# Text columns stay Arrow-backed; numbers keep NumPy dtypes for pandas/Altair.
+ARROW_DTYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+def is_nested_or_null(t: pa.DataType) -> bool:
+    return pa.types.is_nested(t) or pa.types.is_null(t)
+
 def safe_df(data) -> pd.DataFrame:
+    """
+    Build a DataFrame from PostgREST rows via one columnar Arrow pass
+    instead of pandas' per-row dict inference.
+    """
     if not data:
         return pd.DataFrame()
-    return pd.DataFrame(data)
+    try:
+        table = pa.Table.from_pylist(data)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # mixed-type columns, ints wider than int64: let pandas infer object dtype
+        return pd.DataFrame(data)
+    if any(is_nested_or_null(f.type) for f in table.schema):
+        # Arrow merges jsonb objects into one struct (adding other rows' keys
+        # as None); keep the values exactly as PostgREST returned them
+        return pd.DataFrame(data)
+    return table.to_pandas(types_mapper=ARROW_DTYPES.get)
+
+@st.cache_resource
+def projection_cache() -> dict:
+    """
+    (table_name, candidate columns) -> select string known to work.
+    Shared across reruns so a rejected projection is only tried once.
+    """
+    return {}
+
+PROJECTIONS = projection_cache()
+# PROJECTIONS markers: table has none of the candidates / was empty when probed
+NO_COLUMNS = ""
+EMPTY_TABLE = "?"
 
-@st.cache_data(ttl=30)
-def load_table(table_name: str, limit: int | None = None) -> pd.DataFrame:
+@st.cache_resource
+def unordered_tables() -> set:
+    """
+    Tables without an `id` column, so pagination can't order by it.
+    """
+    return set()
+
+UNORDERED = unordered_tables()
+
+def fetch_table(table_name: str, limit: int | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Raw Supabase query. Raises on failure; no Streamlit calls, so it is
+    safe to run from worker threads.
+
+    `columns` lists candidate column names to project server-side. PostgREST
+    rejects unknown columns (42703), so then a one-row "*" probe finds which
+    candidates actually exist and that projection is remembered. If none
+    exist the result is an empty DF, so callers never end up loading every
+    column.
+    """
+    def run(select: str, n: int | None = limit) -> pd.DataFrame:
+        q = supabase.table(table_name).select(select)
+        if n:
+            q = q.limit(n)
+        return safe_df(shared_cached(f"{table_name}:{select}:{n}", lambda: q.execute().data))
+
+    if not columns:
+        return run("*")
+
+    key = (table_name, tuple(columns))
+    select = PROJECTIONS.get(key, ",".join(columns))
+    if select == NO_COLUMNS:
+        return pd.DataFrame()
+    if select != EMPTY_TABLE:
+        try:
+            return run(select)
+        except APIError as e:
+            if e.code != "42703":  # only an undefined column warrants the probe
+                raise
+
+    probe = run("*", n=1)
+    if probe.empty:
+        # nothing to learn from yet; next load goes straight to the probe
+        PROJECTIONS[key] = EMPTY_TABLE
+        return probe
+    present = [c for c in columns if c in probe.columns]
+    if not present:
+        # none of the candidates exist: never widen to "*" for this caller
+        PROJECTIONS[key] = NO_COLUMNS
+        return pd.DataFrame()
+    PROJECTIONS[key] = ",".join(present)
+    return run(PROJECTIONS[key])
+
+def warn_load_failed(table_name: str, e: Exception):
+    st.warning(f"⚠️ Could not load '{table_name}'. (Table missing or RLS blocked)")
+    st.caption(str(e))
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_table(table_name: str, limit: int | None = None, columns: list[str] | None = None) -> pd.DataFrame:
     """
     Load a table from Supabase. Returns empty DF if blocked/missing.
     """
     try:
+        return fetch_table(table_name, limit, columns)
+    except Exception as e:
+        warn_load_failed(table_name, e)
+        return pd.DataFrame()
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_count(table_name: str) -> int:
+    """
+    Exact row count of a table, cached on its own so paging doesn't make
+    Postgres re-run COUNT(*) on every page change. 0 if blocked/missing.
+    """
+    def run():
+        return supabase.table(table_name).select("*", count="exact").limit(1).execute().count
+
+    try:
+        return shared_cached(f"{table_name}:count", run) or 0
+    except Exception as e:
+        warn_load_failed(table_name, e)
+        return 0
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_page(table_name: str, start: int, end: int) -> pd.DataFrame:
+    """
+    Rows start..end (inclusive) of a table, so table pages only transfer
+    and render one page. Ordered by `id` when the table has one. Empty DF
+    if blocked/missing or past the last row.
+    """
+    def query(ordered: bool):
         q = supabase.table(table_name).select("*")
-        if limit:
-            q = q.limit(limit)
-        res = q.execute()
-        return safe_df(res.data)
+        if ordered:
+            # stable order, so rows don't repeat or go missing across pages
+            q = q.order("id")
+        return q.range(start, end).execute().data
+
+    def run():
+        if table_name not in UNORDERED:
+            try:
+                return query(ordered=True)
+            except APIError as e:
+                if e.code != "42703":  # undefined_column: no `id` here
+                    raise
+                UNORDERED.add(table_name)
+        return query(ordered=False)
+
+    try:
+        return safe_df(shared_cached(f"{table_name}:range:{start}:{end}", run))
+    except APIError as e:
+        # PGRST103: offset past the last row (rows went away since counting)
+        if e.code != "PGRST103":
+            warn_load_failed(table_name, e)
+        return pd.DataFrame()
     except Exception as e:
-        st.warning(f"⚠️ Could not load '{table_name}'. (Table missing or RLS blocked)")
-        st.caption(str(e))
+        warn_load_failed(table_name, e)
         return pd.DataFrame()
 
+@st.cache_data(ttl=CACHE_TTL)
+def load_all(specs: dict[str, tuple[str, int | None, list[str] | None]]) -> dict[str, pd.DataFrame]:
+    """
+    Load several tables concurrently: {key: (table_name, limit, columns)} -> {key: DF}.
+    Each query is an independent round-trip, so wall time is the slowest
+    one rather than the sum. Warnings are emitted from the main thread.
+    """
+    out = {}
+    with ThreadPoolExecutor(max_workers=max(len(specs), 1)) as ex:
+        futures = {key: ex.submit(fetch_table, *spec) for key, spec in specs.items()}
+        for key, fut in futures.items():
+            try:
+                out[key] = fut.result()
+            except Exception as e:
+                warn_load_failed(specs[key][0], e)
+                out[key] = pd.DataFrame()
+    return out
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_kpis() -> dict | None:
+    """
+    Dashboard totals from the `njangi_kpis` RPC (see sql/njangi_kpis.sql).
+    Returns None if the function isn't deployed, so callers fall back to
+    summing the raw tables locally.
+    """
+    try:
+        rows = shared_cached("rpc:njangi_kpis", lambda: supabase.rpc("njangi_kpis").execute().data)
+    except Exception:
+        return None
+    return rows[0] if rows else None
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_top_contributors(n: int = 10) -> pd.DataFrame | None:
+    """
+    Member/Amount rows from the `top_contributors` RPC (see
+    sql/top_contributors.sql). Returns None if the function isn't deployed.
+    """
+    try:
+        rows = shared_cached(f"rpc:top_contributors:{n}", lambda: supabase.rpc("top_contributors", {"n": n}).execute().data)
+    except Exception:
+        return None
+    return safe_df(rows).rename(columns={"member": "Member", "amount": "Amount"})
+
 def pick_col(df: pd.DataFrame, options: list[str]) -> str | None:
-    for c in options:
-        if c in df.columns:
-            return c
-    return None
+    cols = set(df.columns)
+    return next((c for c in options if c in cols), None)
+
+def pick_cols(df: pd.DataFrame, aliases: dict[str, list[str]]) -> dict[str, str | None]:
+    """
+    Resolve every alias group against one scan of df.columns:
+    {"time": ["created_at", ...]} -> {"time": "created_at" or None}.
+    """
+    cols = set(df.columns)
+    return {k: next((c for c in options if c in cols), None) for k, options in aliases.items()}
+
+def alias_columns(aliases: dict[str, list[str]]) -> list[str]:
+    """
+    Every candidate column in `aliases`, de-duplicated (for projections).
+    """
+    return list(dict.fromkeys(c for options in aliases.values() for c in options))
 
 def to_number(s):
-    return pd.to_numeric(s, errors="coerce").fillna(0)
+    # Already numeric (the usual case for JSON numbers): nothing to parse
+    if s.dtype.kind in "fiu":
+        return s.fillna(0) if s.hasnans else s
+    # na_value fills while copying; the array may be a read-only view under CoW
+    arr = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float, na_value=0.0)
+    return pd.Series(arr, index=s.index, name=s.name)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=16)
+def kpi_totals(contrib_df: pd.DataFrame, foundation_pay_df: pd.DataFrame, loans_df: pd.DataFrame) -> dict:
+    """
+    Local fallback for the njangi_kpis RPC (same keys), robust to column
+    name differences. Cached on the frames so unchanged data isn't re-summed.
+    """
+    # Contributions total (Njangi Pot)
+    contrib_amount_col = pick_col(contrib_df, CONTRIB_ALIASES["amount"])
+    pot = to_number(contrib_df[contrib_amount_col]).sum() if (not contrib_df.empty and contrib_amount_col) else 0
+
+    # Foundation total (from foundation_payments.amount_paid or amount)
+    foundation_amount_col = pick_col(foundation_pay_df, FOUNDATION_ALIASES["amount"])
+    foundation = to_number(foundation_pay_df[foundation_amount_col]).sum() if (not foundation_pay_df.empty and foundation_amount_col) else 0
+
+    # Outstanding Loans / Total Due
+    loan_due_col = pick_col(loans_df, LOAN_ALIASES["due"])
+    loans_due = to_number(loans_df[loan_due_col]).sum() if (not loans_df.empty and loan_due_col) else 0
+
+    return {"pot": float(pot), "foundation": float(foundation), "loans_due": float(loans_due)}
+
+def lttb(df: pd.DataFrame, x_col: str, y_col: str, n: int = 3000) -> pd.DataFrame:
+    """
+    Largest-Triangle-Three-Buckets downsampling for line charts: keeps the
+    n rows that best preserve the series' shape. `df` must be sorted by
+    `x_col`. Apply before handing long time series to Altair.
+    """
+    # missing x values (NaT/NaN) can't be placed in a bucket
+    df = df[df[x_col].notna()]
+    if n < 3 or len(df) <= n:
+        return df
+    xs = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(xs):
+        # epoch ints (UTC for tz-aware), so DST changes don't repeat/jump x
+        xs = xs.astype("int64")
+    x = xs.to_numpy(dtype=float)
+    y = to_number(df[y_col]).to_numpy(dtype=float)
+
+    # n - 2 buckets between the fixed first and last rows
+    edges = np.linspace(1, len(df) - 1, n - 1).astype(int)
+    keep = [0]
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else len(df))
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep.append(a)
+    keep.append(len(df) - 1)
+    return df.iloc[keep]
 
 def money(x):
-    try:
-        return f"${float(x):,.0f}"
-    except Exception:
+    if isinstance(x, str):
+        x = pd.to_numeric(x, errors="coerce")
+    if not isinstance(x, (numbers.Real, decimal.Decimal)) or pd.isna(x):
         return "$0"
+    return f"${x:,.0f}"
+
+def money_series(s: pd.Series) -> pd.Series:
+    """
+    Column-wise money(): coerce once, then a single bound formatter per row.
+    """
+    return to_number(s).map("${:,.0f}".format)
 
 # ============================================================
-# LOAD DATA (common Njangi tables)
+# COLUMN ALIASES (robust to column name differences)
 # ============================================================
-members_df            = load_table("members")
-contrib_df            = load_table("contributions")
-foundation_pay_df     = load_table("foundation_payments")
-loans_df              = load_table("loans")
-fines_df              = load_table("fines")
-payouts_df            = load_table("payouts")
-history_df            = load_table("history", limit=200)
-sureties_df           = load_table("sureties")
+MEMBER_ALIASES = {
+    "id": ["id", "member_id"],
+    "name": ["name", "full_name", "member_name"],
+}
+CONTRIB_ALIASES = {
+    "amount": ["amount", "amount_paid", "contribution_amount", "paid_amount", "value"],
+    "name": ["member_name", "name", "member", "full_name"],
+    "member_id": ["member_id", "user_id"],
+}
+FOUNDATION_ALIASES = {
+    "amount": ["amount_paid", "amount", "paid_amount", "value"],
+}
+LOAN_ALIASES = {
+    "due": ["total_due", "amount_due", "balance", "due_amount", "remaining_due"],
+}
+HISTORY_ALIASES = {
+    "time": ["created_at", "time", "date", "timestamp"],
+    "type": ["type", "action", "event_type", "category"],
+    "member": ["member_name", "name", "member", "full_name"],
+    "amount": ["amount", "value", "amount_paid"],
+    "interest_pct": ["interest_pct", "interest_rate", "interest_percent"],
+    "total_due": ["total_due", "amount_due", "due_amount"],
+    "interest": ["interest", "interest_amount", "interest_generated"],
+}
 
 # ============================================================
-# COMPUTE METRICS (robust to column name differences)
+# CHARTS
+# Cached on the input frame, so unchanged data reuses the serialized
+# Vega-Lite spec instead of rebuilding it through Altair every rerun.
+# Data reaching Altair is already aggregated (RPC / pandas), so the default
+# inline transformer is kept: VegaFusion would only emit Vega
+# (to_dict(format="vega")), which st.vega_lite_chart can't render.
 # ============================================================
-# Members count
-members_count = len(members_df) if not members_df.empty else 0
-
-# Contributions total (Njangi Pot)
-contrib_amount_col = pick_col(contrib_df, ["amount", "amount_paid", "contribution_amount", "paid_amount", "value"])
-pot_total = to_number(contrib_df[contrib_amount_col]).sum() if (not contrib_df.empty and contrib_amount_col) else 0
-
-# Foundation total (from foundation_payments.amount_paid or amount)
-foundation_amount_col = pick_col(foundation_pay_df, ["amount_paid", "amount", "paid_amount", "value"])
-foundation_total = to_number(foundation_pay_df[foundation_amount_col]).sum() if (not foundation_pay_df.empty and foundation_amount_col) else 0
-
-# Outstanding Loans / Total Due
-# Try common columns
-loan_due_col = pick_col(loans_df, ["total_due", "amount_due", "balance", "due_amount", "remaining_due"])
-loan_principal_col = pick_col(loans_df, ["principal", "amount", "loan_amount"])
-outstanding_loans_due = to_number(loans_df[loan_due_col]).sum() if (not loans_df.empty and loan_due_col) else 0
+@st.cache_data(ttl=CACHE_TTL, max_entries=16)
+def make_top_chart(top: pd.DataFrame) -> dict:
+    return (
+        alt.Chart(top)
+        .mark_bar()
+        .encode(
+            x=alt.X("Member:N", sort="-y"),
+            y=alt.Y("Amount:Q"),
+            tooltip=["Member", alt.Tooltip("Amount:Q", format=",.0f")]
+        )
+        .properties(height=320)
+        .to_dict()
+    )
 
-# Total interest (if present)
-interest_col = pick_col(history_df, ["interest", "interest_amount", "interest_generated"])
-total_interest = to_number(history_df[interest_col]).sum() if (not history_df.empty and interest_col) else 0
+@st.cache_data(ttl=CACHE_TTL, max_entries=16)
+def make_pie_chart(pie_df: pd.DataFrame) -> dict:
+    return (
+        alt.Chart(pie_df)
+        .mark_arc()
+        .encode(
+            theta="Value:Q",
+            color="Category:N",
+            tooltip=["Category", alt.Tooltip("Value:Q", format=",.0f")]
+        )
+        .properties(height=360)
+        .to_dict()
+    )
 
 # ============================================================
 # SIDEBAR NAV (like your website)
@@ -119,6 +468,33 @@ page = st.sidebar.radio(
     index=0
 )
 
+# ============================================================
+# LOAD DATA (each page loads only what it shows)
+# ============================================================
+kpis = load_kpis()
+
+# (table_name, limit, columns) for the Dashboard: every alias its
+# metrics/charts can use. Table pages show full rows and load "*".
+DASHBOARD_TABLES = {
+    "members":             ("members", None, alias_columns(MEMBER_ALIASES)),
+    "contributions":       ("contributions", None, alias_columns(CONTRIB_ALIASES)),
+    "foundation_payments": ("foundation_payments", None, alias_columns(FOUNDATION_ALIASES)),
+    "loans":               ("loans", None, alias_columns(LOAN_ALIASES)),
+    "history":             ("history", 200, alias_columns(HISTORY_ALIASES)),
+}
+
+# ============================================================
+# SIDEBAR METRICS
+# ============================================================
+# Total interest (if present) is shown on every page. Like the RPC it sums
+# all of history; without the RPC only the interest column is fetched.
+if kpis:
+    total_interest = kpis.get("interest") or 0
+else:
+    interest_df = load_table("history", columns=HISTORY_ALIASES["interest"])
+    interest_col = pick_col(interest_df, HISTORY_ALIASES["interest"])
+    total_interest = to_number(interest_df[interest_col]).sum() if (not interest_df.empty and interest_col) else 0
+
 st.sidebar.markdown("---")
 st.sidebar.metric("Total Interest", money(total_interest))
 st.sidebar.caption("Tip: If data shows 0, Streamlit is likely connected to an empty DB or RLS is blocking reads.")
@@ -129,6 +505,34 @@ st.sidebar.caption("Tip: If data shows 0, Streamlit is likely connected to an em
 if page == "Dashboard":
     st.subheader("📊 Dashboard")
 
+    # Tables this page no longer needs once the RPCs did the work
+    top_rpc = load_top_contributors(10)
+    skip = set()
+    if kpis:
+        skip |= {"foundation_payments", "loans"}
+        if top_rpc is not None:
+            skip |= {"contributions", "members"}
+    data = load_all({k: spec for k, spec in DASHBOARD_TABLES.items() if k not in skip})
+
+    members_df        = data.get("members", pd.DataFrame())
+    contrib_df        = data.get("contributions", pd.DataFrame())
+    foundation_pay_df = data.get("foundation_payments", pd.DataFrame())
+    loans_df          = data.get("loans", pd.DataFrame())
+    history_df        = data["history"]
+
+    # Metrics; only this page shows them
+    if kpis:
+        # Totals computed server-side (njangi_kpis RPC)
+        totals = kpis
+        members_count = int(kpis.get("members") or 0)
+    else:
+        totals = kpi_totals(contrib_df, foundation_pay_df, loans_df)
+        members_count = len(members_df) if not members_df.empty else 0
+
+    pot_total = float(totals.get("pot") or 0)
+    foundation_total = float(totals.get("foundation") or 0)
+    outstanding_loans_due = float(totals.get("loans_due") or 0)
+
     # KPI cards
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Njangi Pot", money(pot_total), help="Sum of contributions")
@@ -138,22 +542,32 @@ if page == "Dashboard":
 
     st.markdown("---")
 
+    # Empty DB / RLS blocked: nothing to chart, skip building the specs
+    if not any([pot_total, foundation_total, outstanding_loans_due, members_count]):
+        st.info("Connect a populated Supabase project to see charts.")
+        st.caption(FOOTER)
+        st.stop()
+
     # Top 10 contribution chart
     st.subheader("📈 Contributions (Top 10)")
-    if contrib_df.empty or not contrib_amount_col:
-        st.info("No contributions found (or column name not recognized).")
-    else:
-        name_col = pick_col(contrib_df, ["member_name", "name", "member", "full_name"])
-        member_id_col = pick_col(contrib_df, ["member_id", "user_id"])
-        created_col = pick_col(contrib_df, ["created_at", "date", "paid_at", "timestamp"])
-
-        work = contrib_df.copy()
-        work[contrib_amount_col] = to_number(work[contrib_amount_col])
+    top = top_rpc
+    contrib_cols = pick_cols(contrib_df, CONTRIB_ALIASES)
+    contrib_amount_col = contrib_cols["amount"]
+    if top is None and not contrib_df.empty and contrib_amount_col:
+        # RPC not deployed: group the raw contributions locally
+        name_col = contrib_cols["name"]
+        member_id_col = contrib_cols["member_id"]
+
+        # Only the grouping key and the amount are needed; no full-table copy
+        work = pd.DataFrame({contrib_amount_col: to_number(contrib_df[contrib_amount_col])})
+        key_col = name_col or member_id_col
+        if key_col:
+            work[key_col] = contrib_df[key_col]
 
         # Try to map member names if only member_id exists
         if (not name_col) and member_id_col and not members_df.empty:
-            mem_id_col = pick_col(members_df, ["id", "member_id"])
-            mem_name_col = pick_col(members_df, ["name", "full_name", "member_name"])
+            member_cols = pick_cols(members_df, MEMBER_ALIASES)
+            mem_id_col, mem_name_col = member_cols["id"], member_cols["name"]
             if mem_id_col and mem_name_col:
                 work = work.merge(
                     members_df[[mem_id_col, mem_name_col]].rename(columns={mem_id_col: member_id_col, mem_name_col: "member_name_join"}),
@@ -170,23 +584,15 @@ if page == "Dashboard":
         top = (
             work.groupby(name_col, dropna=False)[contrib_amount_col]
             .sum()
-            .sort_values(ascending=False)
-            .head(10)
+            .nlargest(10)
             .reset_index()
             .rename(columns={name_col: "Member", contrib_amount_col: "Amount"})
         )
 
-        chart = (
-            alt.Chart(top)
-            .mark_bar()
-            .encode(
-                x=alt.X("Member:N", sort="-y"),
-                y=alt.Y("Amount:Q"),
-                tooltip=["Member", alt.Tooltip("Amount:Q", format=",.0f")]
-            )
-            .properties(height=320)
-        )
-        st.altair_chart(chart, use_container_width=True)
+    if top is None or top.empty:
+        st.info("No contributions found (or column name not recognized).")
+    else:
+        st.vega_lite_chart(make_top_chart(top), use_container_width=True)
 
     st.markdown("---")
 
@@ -194,20 +600,10 @@ if page == "Dashboard":
     st.subheader("🥧 Pot vs Foundation vs Loans Due")
     pie_df = pd.DataFrame({
         "Category": ["Pot", "Foundation", "Loans Due"],
-        "Value": [float(pot_total), float(foundation_total), float(outstanding_loans_due)]
+        "Value": [pot_total, foundation_total, outstanding_loans_due]
     })
 
-    pie = (
-        alt.Chart(pie_df)
-        .mark_arc()
-        .encode(
-            theta="Value:Q",
-            color="Category:N",
-            tooltip=["Category", alt.Tooltip("Value:Q", format=",.0f")]
-        )
-        .properties(height=360)
-    )
-    st.altair_chart(pie, use_container_width=True)
+    st.vega_lite_chart(make_pie_chart(pie_df), use_container_width=True)
 
     st.markdown("---")
 
@@ -217,58 +613,95 @@ if page == "Dashboard":
         st.info("No history/activity found.")
     else:
         # Try to format typical columns
-        time_col = pick_col(history_df, ["created_at", "time", "date", "timestamp"])
-        type_col = pick_col(history_df, ["type", "action", "event_type", "category"])
-        member_col = pick_col(history_df, ["member_name", "name", "member", "full_name"])
-        amount_col = pick_col(history_df, ["amount", "value", "amount_paid"])
-        interest_pct_col = pick_col(history_df, ["interest_pct", "interest_rate", "interest_percent"])
-        total_due_col = pick_col(history_df, ["total_due", "amount_due", "due_amount"])
-
-        show_cols = [c for c in [time_col, type_col, member_col, amount_col, interest_pct_col, total_due_col] if c]
-        view = history_df[show_cols].copy() if show_cols else history_df.copy()
-
-        if time_col and time_col in view.columns:
-            # keep as text if parsing fails
+        history_cols = pick_cols(history_df, HISTORY_ALIASES)
+        time_col = history_cols["time"]
+
+        show_keys = ["time", "type", "member", "amount", "interest_pct", "total_due"]
+        show_cols = [history_cols[k] for k in show_keys if history_cols[k]]
+        show_cols = show_cols or list(history_df.columns)
+
+        # Order on the time column alone, then slice the 20 rows shown
+        times = None
+        recent = history_df.index[:20]
+        if time_col:
+            times = history_df[time_col]
+            if not pd.api.types.is_datetime64_any_dtype(times):
+                # ISO8601: PostgREST drops zero fractional seconds, so formats vary per row
+                parsed = pd.to_datetime(times, errors="coerce", utc=True, format="ISO8601")
+                # keep as text unless every value parsed
+                if parsed.notna().sum() == times.notna().sum():
+                    times = parsed
             try:
-                view[time_col] = pd.to_datetime(view[time_col], errors="ignore")
-                view = view.sort_values(time_col, ascending=False)
+                recent = times.sort_values(ascending=False).index[:20]
             except Exception:
-                pass
+                times = None
 
-        st.dataframe(view.head(20), use_container_width=True)
+        view = history_df.loc[recent, show_cols]
+        if times is not None:
+            view = view.assign(**{time_col: times.loc[recent]})
+
+        st.dataframe(view, use_container_width=True)
 
 # ============================================================
 # TABLE PAGES
 # ============================================================
-def table_page(title: str, df: pd.DataFrame):
+def table_page(title: str, table_name: str, max_rows: int | None = None):
+    """
+    Paginated view of one table; `max_rows` caps how far back it pages.
+    """
     st.subheader(title)
+    size_key, page_key = f"{table_name}_page_size", f"{table_name}_page"
+    st.session_state.setdefault(size_key, 100)
+    st.session_state.setdefault(page_key, 1)
+    page_size = st.session_state[size_key]
+    page_no = st.session_state[page_key]
+    total = load_count(table_name)
+    if max_rows:
+        total = min(total, max_rows)
+    # clamp before fetching, e.g. when rows went away since the page was picked
+    n_pages = max(1, -(-total // page_size))
+    page_no = min(page_no, n_pages)
+
+    st.session_state[page_key] = page_no
+
+    start = (page_no - 1) * page_size
+    end = min(start + page_size, total) - 1
+    df = load_page(table_name, start, end) if total else pd.DataFrame()
     if df.empty:
         st.info("No data found.")
-    else:
-        st.dataframe(df, use_container_width=True)
+        return
+    st.dataframe(df, use_container_width=True)
+
+    c1, c2, c3 = st.columns([1, 1, 2])
+    c1.select_slider(
+        "Rows per page", options=[25, 50, 100, 250, 500], key=size_key,
+        on_change=lambda: st.session_state.update({page_key: 1}),
+    )
+    c2.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+    c3.caption(f"Rows {start + 1}–{start + len(df)} of {total}")
 
 if page == "Members":
-    table_page("👥 Members", members_df)
+    table_page("👥 Members", "members")
 
 elif page == "Contributions":
-    table_page("💰 Contributions", contrib_df)
+    table_page("💰 Contributions", "contributions")
 
 elif page == "Foundation Payments":
-    table_page("🏦 Foundation Payments", foundation_pay_df)
+    table_page("🏦 Foundation Payments", "foundation_payments")
 
 elif page == "Loans":
-    table_page("💳 Loans", loans_df)
+    table_page("💳 Loans", "loans")
 
 elif page == "Fines":
-    table_page("⚠️ Fines", fines_df)
+    table_page("⚠️ Fines", "fines")
 
 elif page == "Payouts":
-    table_page("💸 Payouts", payouts_df)
+    table_page("💸 Payouts", "payouts")
 
 elif page == "History":
-    table_page("🧾 History", history_df)
+    table_page("🧾 History", "history", max_rows=200)
 
 elif page == "Sureties":
-    table_page("🛡️ Sureties", sureties_df)
+    table_page("🛡️ Sureties", "sureties")
 
-st.caption("✅ If you see 0s but your website shows data, your Streamlit SUPABASE_URL/ANON_KEY are pointing to a different Supabase project.")
+st.caption(FOOTER)